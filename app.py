@@ -1,16 +1,41 @@
-from flask import Flask, render_template, request, redirect, url_for, session, jsonify, flash
-from werkzeug.security import generate_password_hash, check_password_hash
+from flask import Flask, render_template, request, redirect, url_for, session, jsonify, flash, Response
+from werkzeug.security import check_password_hash
+from argon2 import PasswordHasher
+from argon2.exceptions import VerificationError, InvalidHashError
 from werkzeug.utils import secure_filename
+from flask_caching import Cache
+from PIL import Image, ImageOps
 from functools import wraps
-import json
+from contextlib import contextmanager
+import orjson
+import math
 import os
-from datetime import datetime
+from datetime import datetime, timedelta
 import secrets
+import shutil
+from tempfile import SpooledTemporaryFile
+import threading
+import time
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
 
 app = Flask(__name__)
-app.secret_key = secrets.token_hex(16)
+# Defina SECRET_KEY em produção para as sessões sobreviverem a um restart
+app.secret_key = os.environ.get('SECRET_KEY') or secrets.token_hex(16)
+app.permanent_session_lifetime = timedelta(hours=12)
 app.config['UPLOAD_FOLDER'] = 'static/uploads'
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max
+# Em produção o nginx serve /static/ (ver nginx.conf). Sem ele, os uploads (nomes únicos)
+# ficam 30 dias no cache do navegador, e atrás de Apache/lighttpd USE_X_SENDFILE=1
+# delega o envio dos arquivos ao servidor web.
+app.config['SEND_FILE_MAX_AGE_DEFAULT'] = timedelta(days=30)
+app.config['USE_X_SENDFILE'] = os.environ.get('USE_X_SENDFILE') == '1'
+
+# Cache das páginas renderizadas (vitrine e detalhe do produto)
+cache = Cache(app, config={'CACHE_TYPE': 'FileSystemCache', 'CACHE_DIR': '/tmp/flask_cache'})
 
 # Criar pastas necessárias
 os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
@@ -19,33 +44,331 @@ os.makedirs('data', exist_ok=True)
 # Arquivos JSON
 USERS_FILE = 'data/users.json'
 PRODUCTS_FILE = 'data/products.json'
+PRODUCTS_LOG_FILE = 'data/products.log.jsonl'
+LOG_COMPACT_THRESHOLD = 1000
 
-# Inicializar arquivos JSON se não existirem
-def init_json_files():
-    if not os.path.exists(USERS_FILE):
-        # Admin padrão: admin@modabrasileira.com / admin123
-        admin = {
-            'email': 'admin@modabrasileira.com',
-            'password': generate_password_hash('admin123'),
-            'is_admin': True
-        }
-        with open(USERS_FILE, 'w', encoding='utf-8') as f:
-            json.dump({'users': [admin]}, f, indent=2, ensure_ascii=False)
-    
-    if not os.path.exists(PRODUCTS_FILE):
-        with open(PRODUCTS_FILE, 'w', encoding='utf-8') as f:
-            json.dump({'products': []}, f, indent=2, ensure_ascii=False)
+# Hash de senhas: Argon2id. Hashes antigos do werkzeug (pbkdf2:/scrypt:) continuam
+# válidos e são convertidos no próximo login.
+ph = PasswordHasher(time_cost=3, memory_cost=64 * 1024, parallelism=4)
+
+# Hash fixo (de 'not-a-real-password', mesmos parâmetros do ph) usado no login quando
+# o email não existe, para que a resposta leve o mesmo tempo e não revele contas.
+_DUMMY_HASH = '$argon2id$v=19$m=65536,t=3,p=4$vyjStsc1tKfFlvSPlGSwng$pYcp7KUfn5KnT26l8GhRsnK9js4L6Jr35PnDpktuVb8'
 
-init_json_files()
+# Roda trabalho pesado de CPU (hash de senha) no threadpool do gevent quando o app está
+# sob o worker gevent do gunicorn, para não travar os outros greenlets.
+def run_cpu_bound(func, *args):
+    try:
+        from gevent import get_hub, monkey
+    except ImportError:
+        return func(*args)
+    if not monkey.is_module_patched('threading'):
+        return func(*args)
+    return get_hub().threadpool.apply(func, args)
+
+def hash_password(password):
+    return run_cpu_bound(ph.hash, password)
+
+def _verify_password(stored_hash, password):
+    if not stored_hash.startswith('$argon2'):
+        return check_password_hash(stored_hash, password)
+    try:
+        return ph.verify(stored_hash, password)
+    except (VerificationError, InvalidHashError):
+        return False
+
+def verify_password(stored_hash, password):
+    return run_cpu_bound(_verify_password, stored_hash, password)
+
+def password_needs_rehash(stored_hash):
+    return not stored_hash.startswith('$argon2') or ph.check_needs_rehash(stored_hash)
 
 # Funções auxiliares para JSON
+# Cache em memória: filename -> (versão, dados, índices). Só re-lê o arquivo quando a versão muda.
+_cache = {}
+
+def file_version(filename):
+    mtime = os.stat(filename).st_mtime_ns
+    if filename != PRODUCTS_FILE:
+        return mtime
+    # Produtos: o arquivo base mais o log de operações (o tamanho cobre appends no mesmo tick)
+    try:
+        st = os.stat(PRODUCTS_LOG_FILE)
+        return (mtime, st.st_mtime_ns, st.st_size)
+    except FileNotFoundError:
+        return (mtime, None, 0)
+
+def build_indexes(filename, data):
+    if filename == PRODUCTS_FILE:
+        products = data.get('products', [])
+        return {
+            'by_id': {p['id']: p for p in products},
+            'log_entries': 0
+        }
+    if filename == USERS_FILE:
+        return {'by_email': {u['email']: u for u in data.get('users', [])}}
+    return {}
+
+def _load_entry(filename):
+    version = file_version(filename)
+    entry = _cache.get(filename)
+    if entry and entry[0] == version:
+        return entry
+    with open(filename, 'rb') as f:
+        data = orjson.loads(f.read())
+    indexes = build_indexes(filename, data)
+    if filename == PRODUCTS_FILE:
+        replay_products_log(data, indexes)
+    entry = _cache[filename] = (version, data, indexes)
+    return entry
+
 def load_json(filename):
-    with open(filename, 'r', encoding='utf-8') as f:
-        return json.load(f)
+    return _load_entry(filename)[1]
+
+def load_indexes(filename):
+    return _load_entry(filename)[2]
 
 def save_json(filename, data):
-    with open(filename, 'w', encoding='utf-8') as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
+    # Escreve num arquivo temporário e troca com os.replace (atômico), assim
+    # quem estiver lendo nunca vê um JSON pela metade.
+    tmp = filename + '.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+    os.replace(tmp, filename)
+    if filename == PRODUCTS_FILE:
+        # O estado dos produtos depende também do log; o próximo load reaplica
+        _cache.pop(filename, None)
+    else:
+        _cache[filename] = (file_version(filename), data, build_indexes(filename, data))
+
+# Log de operações dos produtos: cada alteração vira uma linha JSON no fim do
+# products.log.jsonl em vez de reescrever o products.json inteiro. Ao carregar,
+# o log é aplicado sobre o arquivo base; de tempos em tempos ele é compactado.
+def apply_op(data, indexes, op):
+    by_id = indexes['by_id']
+    if op['op'] == 'add':
+        product = op['product']
+        if product['id'] in by_id:
+            # Já estava no arquivo base (compactação interrompida antes de limpar o log)
+            by_id[product['id']].update(product)
+        else:
+            data['products'].append(product)
+            by_id[product['id']] = product
+        data['next_id'] = max(data['next_id'], product['id'] + 1)
+    elif op['op'] == 'update':
+        product = by_id.get(op['id'])
+        if product:
+            product.update(op['fields'])
+    elif op['op'] == 'delete':
+        product = by_id.pop(op['id'], None)
+        if product:
+            data['products'].remove(product)
+
+def replay_products_log(data, indexes):
+    data.setdefault('products', [])
+    if 'next_id' not in data:
+        # Arquivo antigo, sem contador: calcula uma vez a partir dos ids existentes
+        data['next_id'] = max((p['id'] for p in data['products']), default=0) + 1
+    try:
+        f = open(PRODUCTS_LOG_FILE, 'rb')
+    except FileNotFoundError:
+        return
+    with f:
+        for line in f:
+            # Linha sem \n = escrita interrompida no meio; ignora (o próximo
+            # append_op corta essa sobra antes de escrever)
+            if not line.endswith(b'\n'):
+                break
+            apply_op(data, indexes, orjson.loads(line))
+            indexes['log_entries'] += 1
+
+# Posição logo após o último \n do log (0 se não houver nenhum)
+def _last_line_end(f, size):
+    pos = size
+    while pos > 0:
+        start = max(0, pos - 4096)
+        f.seek(start)
+        i = f.read(pos - start).rfind(b'\n')
+        if i != -1:
+            return start + i + 1
+        pos = start
+    return 0
+
+def append_op(op):
+    # Chamado com locked(PRODUCTS_FILE): o cache está em dia com o disco, então a
+    # operação é aplicada direto nele em vez de reler e reaplicar o log todo.
+    version, data, indexes = _load_entry(PRODUCTS_FILE)
+    line = orjson.dumps(op) + b'\n'
+    # Um único write de uma linha curta em modo append é atômico
+    with open(PRODUCTS_LOG_FILE, 'a+b') as f:
+        size = f.seek(0, os.SEEK_END)
+        if size:
+            f.seek(size - 1)
+            if f.read(1) != b'\n':
+                # Sobra de uma escrita interrompida: volta até a última linha completa,
+                # senão a nova linha seria colada nela e o log ficaria ilegível
+                f.truncate(_last_line_end(f, size))
+        f.write(line)
+    apply_op(data, indexes, op)
+    indexes['log_entries'] += 1
+    _cache[PRODUCTS_FILE] = (file_version(PRODUCTS_FILE), data, indexes)
+    if indexes['log_entries'] >= LOG_COMPACT_THRESHOLD:
+        compact_products_log()
+
+def compact_products_log():
+    # Primeiro grava o base com tudo aplicado, depois esvazia o log. Se cair no
+    # meio, reaplicar o log sobre o base novo dá o mesmo resultado.
+    version, data, indexes = _load_entry(PRODUCTS_FILE)
+    save_json(PRODUCTS_FILE, data)
+    open(PRODUCTS_LOG_FILE, 'wb').close()
+    indexes['log_entries'] = 0
+    _cache[PRODUCTS_FILE] = (file_version(PRODUCTS_FILE), data, indexes)
+
+# Lock exclusivo para leitura-modificação-escrita dos arquivos de dados. O threading.Lock
+# serializa threads/greenlets do mesmo processo (com gevent, esperar direto no flock
+# travaria o worker inteiro); o lock no arquivo .lock serializa os workers do gunicorn.
+_locks = {USERS_FILE: threading.Lock(), PRODUCTS_FILE: threading.Lock()}
+
+@contextmanager
+def locked(filename):
+    with _locks[filename], open(filename + '.lock', 'w') as lf:
+        if fcntl:
+            fcntl.flock(lf.fileno(), fcntl.LOCK_EX)
+        else:
+            msvcrt.locking(lf.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(lf.fileno(), fcntl.LOCK_UN)
+            else:
+                lf.seek(0)
+                msvcrt.locking(lf.fileno(), msvcrt.LK_UNLCK, 1)
+
+# Inicializar arquivos JSON se não existirem. Não roda no import: em produção use
+# 'flask --app app init-data' antes de subir o gunicorn; 'python app.py' chama sozinho.
+def init_json_files():
+    if os.path.exists(USERS_FILE) and os.path.exists(PRODUCTS_FILE):
+        return
+    
+    with locked(USERS_FILE):
+        if not os.path.exists(USERS_FILE):
+            # Admin padrão: admin@modabrasileira.com / admin123
+            admin = {
+                'email': 'admin@modabrasileira.com',
+                'password': hash_password('admin123'),
+                'is_admin': True
+            }
+            save_json(USERS_FILE, {'users': [admin]})
+    
+    with locked(PRODUCTS_FILE):
+        if os.path.exists(PRODUCTS_FILE):
+            return
+        if os.path.exists(PRODUCTS_LOG_FILE) and os.path.getsize(PRODUCTS_LOG_FILE):
+            # Um base vazio sob o log existente perderia produtos e reusaria ids
+            app.logger.error('%s não existe mas %s tem operações; restaure o arquivo base',
+                             PRODUCTS_FILE, PRODUCTS_LOG_FILE)
+            return
+        save_json(PRODUCTS_FILE, {'products': [], 'next_id': 1})
+
+@app.cli.command('init-data')
+def init_data_command():
+    """Cria os arquivos de dados iniciais (flask --app app init-data)."""
+    init_json_files()
+
+# No import só confere se os arquivos existem (nada de hash da senha do admin por worker)
+if not (os.path.exists(USERS_FILE) and os.path.exists(PRODUCTS_FILE)):
+    app.logger.warning('Arquivos de dados não encontrados; rode "flask --app app init-data"')
+
+# Versão atual dos produtos, usada nas chaves do cache de páginas: qualquer
+# alteração nos produtos muda a chave e as páginas antigas deixam de ser usadas.
+def products_version():
+    try:
+        return file_version(PRODUCTS_FILE)
+    except FileNotFoundError:
+        return 0
+
+# Páginas com usuário logado ou mensagens flash dependem da sessão e não vão pro cache
+def has_session_state():
+    return 'user_email' in session or '_flashes' in session
+
+# Só guarda no cache páginas renderizadas, nunca redirects
+def is_rendered_page(rv):
+    return isinstance(rv, str)
+
+# Converte o preço do formulário; None se não for um número finito e não negativo
+# (nan/inf virariam null no JSON e quebrariam o format das páginas)
+def parse_price(value):
+    try:
+        price = float(value)
+    except (TypeError, ValueError):
+        return None
+    if not math.isfinite(price) or price < 0:
+        return None
+    return price
+
+# Gera as versões WebP da imagem: _1200.webp (página do produto) e _thumb.webp (listagens).
+# Devolve os caminhos gerados ou None se o arquivo não for uma imagem que o Pillow abra.
+def make_webp_variants(image_path):
+    base = image_path.rsplit('.', 1)[0]
+    try:
+        with Image.open(image_path) as im:
+            im = ImageOps.exif_transpose(im)
+            im = im.convert('RGBA' if 'A' in im.getbands() or 'transparency' in im.info else 'RGB')
+            im.thumbnail((1200, 1200))
+            im.save(base + '_1200.webp', 'WEBP', quality=82, method=6)
+            im.thumbnail((400, 400))
+            im.save(base + '_thumb.webp', 'WEBP', quality=80, method=6)
+    except (OSError, Image.DecompressionBombError):
+        return None
+    return base + '_1200.webp', base + '_thumb.webp'
+
+# Salva a imagem enviada em UPLOAD_FOLDER e devolve os caminhos (relativos a static/)
+# do original e das versões WebP. Se o upload já está num arquivo em disco, copia direto
+# no kernel com os.sendfile; senão usa blocos de 1 MiB.
+def save_image(image):
+    # Sufixo aleatório: dois uploads no mesmo segundo não se sobrescrevem
+    filename = f"{int(time.time())}_{secrets.token_hex(4)}_{secure_filename(image.filename)}"
+    image_path = os.path.join(app.config['UPLOAD_FOLDER'], filename)
+    src = image.stream
+    # Uploads pequenos ficam na memória do SpooledTemporaryFile; chamar fileno() neles
+    # forçaria uma gravação extra num arquivo temporário antes do sendfile
+    on_disk = not isinstance(src, SpooledTemporaryFile) or src._rolled
+    with open(image_path, 'wb') as dst:
+        if on_disk:
+            try:
+                src_fd = src.fileno()
+                size = os.fstat(src_fd).st_size
+                offset = 0
+                while offset < size:
+                    sent = os.sendfile(dst.fileno(), src_fd, offset, size - offset)
+                    if sent == 0:
+                        break
+                    offset += sent
+                on_disk = offset == size
+            except (AttributeError, OSError):
+                # Sem sendfile (Windows) ou stream sem arquivo por trás: cópia em blocos
+                on_disk = False
+        if not on_disk:
+            src.seek(0)
+            dst.seek(0)
+            dst.truncate()
+            shutil.copyfileobj(src, dst, length=1 << 20)
+    
+    image_url = f"uploads/{filename}"
+    variants = run_cpu_bound(make_webp_variants, image_path)
+    if not variants:
+        return {'image': image_url, 'image_webp': image_url, 'image_thumb': image_url}
+    webp_path, thumb_path = variants
+    return {
+        'image': image_url,
+        'image_webp': f"uploads/{os.path.basename(webp_path)}",
+        'image_thumb': f"uploads/{os.path.basename(thumb_path)}"
+    }
+
+# Único ponto de acesso aos usuários por email (só usado em login e cadastro)
+def find_user(email):
+    return load_indexes(USERS_FILE)['by_email'].get(email)
 
 # Decorador para rotas que precisam de login
 def login_required(f):
@@ -56,7 +379,9 @@ def login_required(f):
         return f(*args, **kwargs)
     return decorated_function
 
-# Decorador para rotas admin
+# Decorador para rotas admin. Confia só no cookie de sessão assinado (user_email e
+# is_admin gravados no login): nunca deve chamar find_user/load_json(USERS_FILE),
+# assim as rotas protegidas não fazem I/O para autorizar.
 def admin_required(f):
     @wraps(f)
     def decorated_function(*args, **kwargs):
@@ -68,26 +393,29 @@ def admin_required(f):
 
 # Rotas
 @app.route('/')
+@cache.cached(timeout=300, key_prefix=lambda: f"index_{products_version()}",
+              unless=has_session_state, response_filter=is_rendered_page)
 def index():
     try:
         data = load_json(PRODUCTS_FILE)
         products = data.get('products', [])
-    except (FileNotFoundError, json.JSONDecodeError):
+    except (FileNotFoundError, orjson.JSONDecodeError):
         init_json_files()
         products = []
     return render_template('index.html', products=products)
 
 @app.route('/produto/<int:product_id>')
+@cache.cached(timeout=300,
+              key_prefix=lambda: f"product_{request.view_args['product_id']}_{products_version()}",
+              unless=has_session_state, response_filter=is_rendered_page)
 def product_detail(product_id):
     try:
-        data = load_json(PRODUCTS_FILE)
-        products = data.get('products', [])
-        product = next((p for p in products if p['id'] == product_id), None)
+        product = load_indexes(PRODUCTS_FILE)['by_id'].get(product_id)
         if not product:
             flash('Produto não encontrado', 'error')
             return redirect(url_for('index'))
         return render_template('product_detail.html', product=product)
-    except (FileNotFoundError, json.JSONDecodeError):
+    except (FileNotFoundError, orjson.JSONDecodeError):
         flash('Erro ao carregar produtos', 'error')
         return redirect(url_for('index'))
 
@@ -101,19 +429,24 @@ def register():
             flash('Preencha todos os campos', 'error')
             return redirect(url_for('register'))
         
-        data = load_json(USERS_FILE)
-        users = data.get('users', [])
-        
-        if any(u['email'] == email for u in users):
+        if find_user(email):
             flash('Email já cadastrado', 'error')
             return redirect(url_for('register'))
         
-        users.append({
-            'email': email,
-            'password': generate_password_hash(password),
-            'is_admin': False
-        })
-        save_json(USERS_FILE, {'users': users})
+        password_hash = hash_password(password)
+        with locked(USERS_FILE):
+            # Confere de novo: outro worker pode ter cadastrado o mesmo email
+            if find_user(email):
+                flash('Email já cadastrado', 'error')
+                return redirect(url_for('register'))
+            
+            users = load_json(USERS_FILE).get('users', [])
+            users.append({
+                'email': email,
+                'password': password_hash,
+                'is_admin': False
+            })
+            save_json(USERS_FILE, {'users': users})
         
         flash('Cadastro realizado com sucesso!', 'success')
         return redirect(url_for('login'))
@@ -126,11 +459,24 @@ def login():
         email = request.form.get('email')
         password = request.form.get('password')
         
-        data = load_json(USERS_FILE)
-        users = data.get('users', [])
-        user = next((u for u in users if u['email'] == email), None)
+        if not email or not password:
+            flash('Preencha todos os campos', 'error')
+            return redirect(url_for('login'))
         
-        if user and check_password_hash(user['password'], password):
+        user = find_user(email)
+        
+        candidate = user['password'] if user else _DUMMY_HASH
+        ok = verify_password(candidate, password)
+        
+        if user and ok:
+            if password_needs_rehash(user['password']):
+                password_hash = hash_password(password)
+                with locked(USERS_FILE):
+                    current = find_user(email)
+                    if current:
+                        current['password'] = password_hash
+                        save_json(USERS_FILE, load_json(USERS_FILE))
+            session.permanent = True
             session['user_email'] = email
             session['is_admin'] = user.get('is_admin', False)
             flash('Login realizado com sucesso!', 'success')
@@ -165,34 +511,37 @@ def add_product():
         sizes = request.form.getlist('sizes')
         image = request.files.get('image')
         
-        if not all([name, description, price, category, image]):
+        if not (name and description and price and category and image):
             flash('Preencha todos os campos', 'error')
             return redirect(url_for('add_product'))
         
+        # Valida o preço antes de gravar a imagem em disco
+        price = parse_price(price)
+        if price is None:
+            flash('Preço inválido', 'error')
+            return redirect(url_for('add_product'))
+        
         # Salvar imagem
-        filename = secure_filename(image.filename)
-        timestamp = datetime.now().strftime('%Y%m%d%H%M%S')
-        filename = f"{timestamp}_{filename}"
-        image_path = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-        image.save(image_path)
+        images = save_image(image)
         
         # Adicionar produto
-        data = load_json(PRODUCTS_FILE)
-        products = data.get('products', [])
-        new_id = max([p['id'] for p in products], default=0) + 1
-        
-        products.append({
-            'id': new_id,
-            'name': name,
-            'description': description,
-            'price': float(price),
-            'category': category,
-            'sizes': sizes,
-            'image': f"uploads/{filename}",
-            'created_at': datetime.now().isoformat()
-        })
-        
-        save_json(PRODUCTS_FILE, {'products': products})
+        with locked(PRODUCTS_FILE):
+            data = load_json(PRODUCTS_FILE)
+            new_id = data['next_id']
+            data['next_id'] += 1
+            
+            append_op({'op': 'add', 'product': {
+                'id': new_id,
+                'name': name,
+                'description': description,
+                'price': price,
+                'category': category,
+                'sizes': sizes,
+                'image': images['image'],
+                'image_webp': images['image_webp'],
+                'image_thumb': images['image_thumb'],
+                'created_at': datetime.now().isoformat()
+            }})
         flash('Produto adicionado com sucesso!', 'success')
         return redirect(url_for('admin_panel'))
     
@@ -201,31 +550,32 @@ def add_product():
 @app.route('/admin/editar/<int:product_id>', methods=['GET', 'POST'])
 @admin_required
 def edit_product(product_id):
-    data = load_json(PRODUCTS_FILE)
-    products = data.get('products', [])
-    product = next((p for p in products if p['id'] == product_id), None)
+    product = load_indexes(PRODUCTS_FILE)['by_id'].get(product_id)
     
     if not product:
         flash('Produto não encontrado', 'error')
         return redirect(url_for('admin_panel'))
     
     if request.method == 'POST':
-        product['name'] = request.form.get('name')
-        product['description'] = request.form.get('description')
-        product['price'] = float(request.form.get('price'))
-        product['category'] = request.form.get('category')
-        product['sizes'] = request.form.getlist('sizes')
+        price = parse_price(request.form.get('price'))
+        if price is None:
+            flash('Preço inválido', 'error')
+            return redirect(url_for('edit_product', product_id=product_id))
+        
+        fields = {
+            'name': request.form.get('name'),
+            'description': request.form.get('description'),
+            'price': price,
+            'category': request.form.get('category'),
+            'sizes': request.form.getlist('sizes')
+        }
         
         image = request.files.get('image')
         if image and image.filename:
-            filename = secure_filename(image.filename)
-            timestamp = datetime.now().strftime('%Y%m%d%H%M%S')
-            filename = f"{timestamp}_{filename}"
-            image_path = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-            image.save(image_path)
-            product['image'] = f"uploads/{filename}"
-        
-        save_json(PRODUCTS_FILE, {'products': products})
+            fields.update(save_image(image))
+        
+        with locked(PRODUCTS_FILE):
+            append_op({'op': 'update', 'id': product_id, 'fields': fields})
         flash('Produto atualizado com sucesso!', 'success')
         return redirect(url_for('admin_panel'))
     
@@ -234,12 +584,27 @@ def edit_product(product_id):
 @app.route('/admin/deletar/<int:product_id>', methods=['POST'])
 @admin_required
 def delete_product(product_id):
-    data = load_json(PRODUCTS_FILE)
-    products = data.get('products', [])
-    products = [p for p in products if p['id'] != product_id]
-    save_json(PRODUCTS_FILE, {'products': products})
+    with locked(PRODUCTS_FILE):
+        append_op({'op': 'delete', 'id': product_id})
     flash('Produto deletado com sucesso!', 'success')
     return redirect(url_for('admin_panel'))
 
+# JSON da API já serializado, por versão dos produtos (guarda só a versão atual)
+_api_cache = {}
+
+@app.route('/api/products')
+def api_products():
+    try:
+        version, data, _ = _load_entry(PRODUCTS_FILE)
+    except (FileNotFoundError, orjson.JSONDecodeError):
+        return Response(orjson.dumps({'products': []}), mimetype='application/json')
+    body = _api_cache.get(version)
+    if body is None:
+        body = orjson.dumps({'products': data.get('products', [])})
+        _api_cache.clear()
+        _api_cache[version] = body
+    return Response(body, mimetype='application/json')
+
 if __name__ == '__main__':
+    init_json_files()
     app.run(debug=True, port=5000)
\ No newline at end of file
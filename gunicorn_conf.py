@@ -0,0 +1,16 @@
+# Configuração do gunicorn para produção:
+#   gunicorn -c gunicorn_conf.py app:app
+# O monkey patch do gevent precisa acontecer antes do import do Flask (app.py).
+from gevent import monkey
+monkey.patch_all()
+
+import multiprocessing
+
+bind = '127.0.0.1:5000'  # atrás do nginx (nginx.conf)
+worker_class = 'gevent'
+workers = 2 * multiprocessing.cpu_count() + 1
+worker_connections = 1000
+
+# Carrega o app uma vez no master antes do fork: todos os workers compartilham a mesma
+# secret_key. Os arquivos de dados são criados antes, com 'flask --app app init-data'.
+preload_app = True